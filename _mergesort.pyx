@@ -0,0 +1,131 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Compiled drop-in for sort_kernel._mergesort_record, same step columns"""
+import numpy as np
+from cython.parallel import prange
+
+# Must match the op codes and TASK_SIZE in sort_kernel.py
+cdef enum:
+    OP_SPLIT = 0
+    OP_MERGE_PLACE = 1
+    OP_MERGE_TAIL = 2
+    TASK_SIZE = 4096
+
+# Step column dtypes: int8 type, int32 index, int64 value, int8 level, int64 extra
+ctypedef signed char i8_t
+ctypedef int i32_t
+
+
+cdef Py_ssize_t _co_rank(long long[::1] buf, Py_ssize_t lo, Py_ssize_t mid, Py_ssize_t hi,
+                         Py_ssize_t d) noexcept nogil:
+    cdef Py_ssize_t low = max(0, d - (hi - mid)), high = min(d, mid - lo), i
+
+    while low < high:
+        i = (low + high) // 2
+        if buf[lo + i] <= buf[mid + d - i - 1]:
+            low = i + 1
+        else:
+            high = i
+    return low
+
+
+cdef void _merge_range(long long[::1] buf, long long[::1] tgt, Py_ssize_t lo, Py_ssize_t mid,
+                       Py_ssize_t hi, Py_ssize_t start, Py_ssize_t stop, i8_t level,
+                       i8_t[::1] step_type, i32_t[::1] step_index, long long[::1] step_value,
+                       i8_t[::1] step_level, long long[::1] step_extra, Py_ssize_t k) noexcept nogil:
+    cdef Py_ssize_t i, j, ipos, slot
+    cdef long long v
+    cdef i8_t code
+
+    if start == lo:
+        step_type[k] = OP_SPLIT
+        step_index[k] = lo
+        step_value[k] = mid
+        step_level[k] = level
+        step_extra[k] = hi
+
+    i = lo + _co_rank(buf, lo, mid, hi, start - lo)
+    j = mid + (start - i)
+    for ipos in range(start, stop):
+        code = OP_MERGE_PLACE if i < mid and j < hi else OP_MERGE_TAIL
+        if j >= hi or (i < mid and buf[i] <= buf[j]):
+            v = buf[i]
+            i += 1
+        else:
+            v = buf[j]
+            j += 1
+        tgt[ipos] = v
+
+        slot = k + 1 + ipos - lo
+        step_type[slot] = code
+        step_index[slot] = ipos
+        step_value[slot] = v
+        step_level[slot] = level
+        step_extra[slot] = buf[ipos]
+
+
+cdef void _merge_task(long long[::1] buf, long long[::1] tgt, Py_ssize_t width, i8_t level,
+                      i8_t[::1] step_type, i32_t[::1] step_index, long long[::1] step_value,
+                      i8_t[::1] step_level, long long[::1] step_extra, Py_ssize_t k,
+                      Py_ssize_t start, Py_ssize_t stop) noexcept nogil:
+    cdef Py_ssize_t n = buf.shape[0], run = 2 * width, lo, mid, hi, ipos
+
+    lo = start // run * run
+    while lo < stop:
+        mid = min(lo + width, n)
+        hi = min(lo + run, n)
+        if mid < hi:
+            _merge_range(buf, tgt, lo, mid, hi, max(lo, start), min(hi, stop), level,
+                         step_type, step_index, step_value, step_level, step_extra,
+                         k + lo // run * (run + 1))
+        else:
+            # A lone trailing run is copied over unchanged, each task only its own part
+            for ipos in range(max(lo, start), min(hi, stop)):
+                tgt[ipos] = buf[ipos]
+        lo += run
+
+
+def sort_and_record(long long[::1] arr, i8_t[::1] step_type, i32_t[::1] step_index,
+                    long long[::1] step_value, i8_t[::1] step_level, long long[::1] step_extra):
+    """Bottom-up merge sort of arr in place, returns the number of steps written"""
+    cdef Py_ssize_t n = arr.shape[0]
+    cdef Py_ssize_t passes = 0, width = 1, run, last, t, k = 0
+    cdef Py_ssize_t num_tasks = (n + TASK_SIZE - 1) // TASK_SIZE
+    cdef i8_t level
+    cdef long long[::1] buf = arr
+    cdef long long[::1] tgt = np.empty(n, dtype=np.int64)
+    cdef long long[::1] swap
+
+    while width < n:
+        passes += 1
+        width *= 2
+
+    width = 1
+    level = passes - 1
+    with nogil:
+        while width < n:
+            # Tasks only run on several threads when built with OpenMP
+            if num_tasks == 1:
+                _merge_task(buf, tgt, width, level, step_type, step_index, step_value,
+                            step_level, step_extra, k, 0, n)
+            else:
+                for t in prange(num_tasks):
+                    _merge_task(buf, tgt, width, level, step_type, step_index, step_value,
+                                step_level, step_extra, k, t * TASK_SIZE, min((t + 1) * TASK_SIZE, n))
+
+            # Full merges record run + 1 steps each; a lone trailing run records none
+            run = 2 * width
+            last = (n - 1) // run * run
+            k += last // run * (run + 1)
+            if last + width < n:
+                k += n - last + 1
+
+            swap = buf
+            buf = tgt
+            tgt = swap
+            width *= 2
+            level -= 1
+
+        # After an odd number of passes the sorted data sits in the scratch buffer
+        if passes % 2 == 1:
+            arr[:] = buf
+    return k
@@ -1,9 +1,9 @@
 import streamlit as st
-import time
 import plotly.graph_objects as go
-import plotly.express as px
 from plotly.subplots import make_subplots
-import random
+import numpy as np
+
+from sort_kernel import OP_MERGE_PLACE, OP_MERGE_TAIL, OP_SPLIT, alloc_steps, sort_and_record
 
 # Configure page
 st.set_page_config(
@@ -13,8 +13,7 @@ st.set_page_config(
 )
 
 # Custom CSS for dark theme and styling
-st.markdown("""
-<style>
+CUSTOM_CSS = """
     .stApp {
         background-color: #0e1117;
         color: #ffffff;
@@ -74,219 +73,383 @@ st.markdown("""
         transform: translateY(-2px);
         box-shadow: 0 5px 15px rgba(255, 107, 107, 0.4);
     }
-</style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def inject_css():
+    """Send the custom stylesheet; Streamlit replays the cached element on reruns"""
+    st.markdown(f"<style>{CUSTOM_CSS}</style>", unsafe_allow_html=True)
+    return True
+
+# Step descriptions are formatted from the recorded ints only when a step is shown
+STEP_DESCRIPTIONS = {
+    OP_SPLIT: 'Splitting array at position {value}',
+    OP_MERGE_PLACE: 'Merging: placed {value} at position {idx}',
+    OP_MERGE_TAIL: 'Adding remaining element {value}',
+}
+
+# Highlight colors for the bars and nodes
+COLOR_DEFAULT = '#4ecdc4'  # Cyan for default/sorted elements
+COLOR_LEFT = '#ff6b6b'  # Red for left partition
+COLOR_RIGHT = '#ffa500'  # Orange for right partition
+COLOR_MERGE = '#00ff00'  # Green for current merge
+# Indexed by the per-element color code built in _build_frame
+PALETTE = np.array([COLOR_DEFAULT, COLOR_LEFT, COLOR_RIGHT, COLOR_MERGE])
+CODE_LEFT, CODE_RIGHT, CODE_MERGE = 1, 2, 3
+
+# Shared figure styling; Plotly copies these on assignment, so one instance serves every call
+TRANSPARENT = 'rgba(0,0,0,0)'
+GRID_COLOR = 'rgba(255,255,255,0.1)'
+WHITE_FONT = dict(color='white')
+MARKER_LINE = dict(color='white', width=2)
+BAR_TEXTFONT = dict(size=14, color='white')
+NODE_TEXTFONT = dict(size=12, color='white')
+FIGURE_MARGIN = dict(l=50, r=50, t=50, b=50)
+SUBPLOT_TITLE = dict(font=dict(size=16), showarrow=False, x=0.5, xanchor='center', xref='paper', y=1.0, yanchor='bottom', yref='paper')
+X_AXIS = dict(title="Index", showgrid=False, color='white', tickfont=WHITE_FONT)
+Y_AXIS_COMMON = dict(title="Value", color='white', tickfont=WHITE_FONT)
+
+# Keep the chart interactive but skip Plotly's resize observer on every update
+PLOTLY_CONFIG = {'staticPlot': False, 'responsive': False}
+
+# Longer sorts are sampled down to this many steps, more than anyone steps through
+MAX_VISIBLE_STEPS = 256
+
+@st.cache_data(max_entries=32)
+def compute_steps(arr_tuple):
+    """Sorted array and recorded step columns for an input, memoized across reruns"""
+    # The compiled kernel sorts in place and fills preallocated step columns
+    buf = np.asarray(arr_tuple, dtype=np.int64)
+    columns = alloc_steps(len(buf))
+    num_steps = sort_and_record(buf, *columns)
+    return buf, tuple(column[:num_steps].copy() for column in columns)
+
+@st.cache_data
+def compute_stats(arr_tuple):
+    """Sidebar statistics for an input, memoized across reruns"""
+    a = np.fromiter(arr_tuple, dtype=np.int64, count=len(arr_tuple))
+    return {
+        "Elements": int(a.size),
+        "Min Value": int(a.min()),
+        "Max Value": int(a.max())
+    }
 
 class MergeSortVisualizer:
-    def _init_(self):
-        self.array = []
-        self.steps = []
-        self.colors = px.colors.qualitative.Set3
+    def __init__(self):
+        self.array = np.empty(0, dtype=np.int64)
+        self.num_steps = 0
+        self.sampled = False
+        self._initial_array = None
+        self._array_at_step = None
+        self._frames = []
+        # Figures reused across renders, rebuilt only when their subplot layout changes
+        self._figs = {}
+        # Figure that already carries the playback frames for the current sort
+        self._animation = None
         
-    def merge_sort_with_steps(self, arr, start_idx=0, level=0):
+    def merge_sort_with_steps(self, arr):
         """Merge sort with step tracking for visualization"""
-        if len(arr) <= 1:
-            return arr
-            
-        # Record the split step
-        mid = len(arr) // 2
-        left_part = arr[:mid]
-        right_part = arr[mid:]
+        self._initial_array = np.array(arr, dtype=np.int64)
+        self._array_at_step = None
+        self._animation = None
+        self.array, columns = compute_steps(tuple(arr))
+        # One array per step field instead of a record per step
+        self._step_type, self._step_index, self._step_value, self._step_level, self._step_extra = columns
         
-        self.steps.append({
-            'type': 'split',
-            'array': self.array.copy(),
-            'left': [start_idx + i for i in range(len(left_part))],
-            'right': [start_idx + mid + i for i in range(len(right_part))],
-            'level': level,
-            'description': f'Splitting array at position {mid}'
-        })
-        
-        # Recursively sort both halves
-        left_sorted = self.merge_sort_with_steps(left_part, start_idx, level + 1)
-        right_sorted = self.merge_sort_with_steps(right_part, start_idx + mid, level + 1)
+        # Sample evenly across the sort, always keeping the first and final steps
+        num_recorded = len(self._step_type)
+        if num_recorded > MAX_VISIBLE_STEPS:
+            kept = np.linspace(0, num_recorded - 1, MAX_VISIBLE_STEPS).astype(np.int64)
+        else:
+            kept = np.arange(num_recorded)
         
-        # Merge the sorted halves
-        merged = self.merge_with_steps(left_sorted, right_sorted, start_idx, level)
+        # Steps never change after sorting, so every frame's trace data is built once;
+        # replay needs every recorded delta, so frames are built before the columns are sampled
+        self._frames = [self._build_frame(self.step(i), self._materialize(i)) for i in kept]
+        self._step_type, self._step_index, self._step_value, self._step_level, self._step_extra = (
+            column[kept] for column in columns
+        )
+        # Sampled columns skip deltas, so replaying them would rebuild wrong arrays;
+        # drop the replay state and rely on _frames from here on
+        self._initial_array = None
+        self._array_at_step = None
+        self.sampled = len(kept) < num_recorded
+        self.num_steps = len(kept)
+        return self.array
+    
+    def step(self, step_idx):
+        """Dict view of one recorded step, in the format used for rendering"""
+        op_code = int(self._step_type[step_idx])
+        idx = int(self._step_index[step_idx])
+        value = int(self._step_value[step_idx])
+        level = int(self._step_level[step_idx])
+        extra = int(self._step_extra[step_idx])
+        description = STEP_DESCRIPTIONS[op_code].format(idx=idx, value=value)
+        if op_code == OP_SPLIT:
+            return {
+                'type': 'split',
+                'left': np.arange(idx, value),
+                'right': np.arange(value, extra),
+                'level': level,
+                'description': description
+            }
         
-        return merged
+        return {
+            'type': 'merge',
+            'idx': idx,
+            'old': extra,
+            'new': value,
+            'comparing': np.array([idx]),
+            'level': level,
+            'description': description
+        }
     
-    def merge_with_steps(self, left, right, start_idx, level):
-        """Merge two sorted arrays with step tracking"""
-        result = []
-        i = j = 0
-        result_idx = start_idx
+    def _materialize(self, step_idx):
+        """Rebuild the array as it looked after steps[step_idx] by replaying deltas
+
+        Only valid while the step columns still hold every recorded step, i.e.
+        while merge_sort_with_steps builds the frames.
+        """
+        # Seek from the cached position, or restart from the initial array when that's closer
+        if self._array_at_step is None or step_idx + 1 < abs(self._array_at_step[0] - step_idx):
+            self._array_at_step = (-1, self._initial_array.copy())
+        cached_idx, arr = self._array_at_step
         
-        while i < len(left) and j < len(right):
-            if left[i] <= right[j]:
-                result.append(left[i])
-                self.array[result_idx] = left[i]
-                i += 1
-            else:
-                result.append(right[j])
-                self.array[result_idx] = right[j]
-                j += 1
-            
-            result_idx += 1
-            
-            # Record merge step
-            self.steps.append({
-                'type': 'merge',
-                'array': self.array.copy(),
-                'comparing': [start_idx + len(result) - 1],
-                'level': level,
-                'description': f'Merging: placed {result[-1]} at position {result_idx - 1}'
-            })
+        # Forward replay applies new values, backward replay restores old ones
+        while cached_idx < step_idx:
+            cached_idx += 1
+            if self._step_type[cached_idx] != OP_SPLIT:
+                arr[self._step_index[cached_idx]] = self._step_value[cached_idx]
+        while cached_idx > step_idx:
+            if self._step_type[cached_idx] != OP_SPLIT:
+                arr[self._step_index[cached_idx]] = self._step_extra[cached_idx]
+            cached_idx -= 1
         
-        # Add remaining elements
-        while i < len(left):
-            result.append(left[i])
-            self.array[result_idx] = left[i]
-            self.steps.append({
-                'type': 'merge',
-                'array': self.array.copy(),
-                'comparing': [result_idx],
-                'level': level,
-                'description': f'Adding remaining element {left[i]}'
-            })
-            i += 1
-            result_idx += 1
+        self._array_at_step = (cached_idx, arr)
+        return arr.copy()
+    
+    def _build_frame(self, step, values):
+        """Trace data for one step: (values, labels, colors, sizes, hovertext)"""
+        values = np.asarray(values)
+        n = len(values)
+        codes = np.zeros(n, dtype=np.int8)
         
-        while j < len(right):
-            result.append(right[j])
-            self.array[result_idx] = right[j]
-            self.steps.append({
-                'type': 'merge',
-                'array': self.array.copy(),
-                'comparing': [result_idx],
-                'level': level,
-                'description': f'Adding remaining element {right[j]}'
-            })
-            j += 1
-            result_idx += 1
+        def highlight(idxs, code):
+            idxs = np.asarray(idxs, dtype=np.int64)
+            codes[idxs[(idxs >= 0) & (idxs < n)]] = code
+        
+        if step['type'] == 'split':
+            highlight(step.get('left', []), CODE_LEFT)
+            highlight(step.get('right', []), CODE_RIGHT)
+        elif step['type'] == 'merge':
+            highlight(step.get('comparing', []), CODE_MERGE)
         
-        return result
+        # Map codes to colors in one lookup; merged elements get a larger node
+        colors = PALETTE[codes]
+        sizes = np.where(codes == CODE_MERGE, 40, 30)
+        hovertext = [f'Value: {v}' for v in values]
+        # Text labels as strings; plotly would send an int64 array as float64 and round large values
+        labels = values.astype(str)
+        return values, labels, colors, sizes, hovertext
     
-    def create_visualization(self, step_data, title="", show_previous=False, viz_types=['Bars', 'Nodes']):
-        """Create visualization based on user-selected types"""
-        n = len(step_data['array'])
-        rows = 2 if show_previous and step_data.get('previous_step') else 1
-        cols = len(viz_types)
+    def create_initial(self, array, title="", viz_types=['Bars', 'Nodes']):
+        """Figure for the unsorted array, before any steps exist"""
+        frame = self._build_frame({'type': 'initial'}, array)
+        return self._panel_figure('current', frame, title, viz_types)
+    
+    def create_current(self, step_idx, title="", viz_types=['Bars', 'Nodes']):
+        """Figure for the step being shown"""
+        return self._panel_figure('current', self._frames[step_idx], title, viz_types)
+    
+    def create_previous(self, step_idx, viz_types=['Bars', 'Nodes']):
+        """Figure for the kept step before step_idx, shown under the current one"""
+        # In a sampled sort the panel shows the previous sample, not the step just before
+        title = f"Previous Sampled Step ({viz_types[0]})" if self.sampled else f"Previous Step ({viz_types[0]})"
+        return self._panel_figure('previous', self._frames[step_idx - 1], title, viz_types)
+    
+    def create_animation(self, start_step, viz_types=['Bars', 'Nodes'], frame_duration=1000):
+        """One figure holding every step as a Plotly frame, played back in the browser"""
+        title = f"Step {start_step + 1}: {self.step(start_step)['description']}"
+        fig = self._panel_figure('animation', self._frames[start_step], title, viz_types)
+        play_args = dict(frame=dict(duration=frame_duration, redraw=True), transition=dict(duration=0), fromcurrent=True, mode='immediate')
         
-        # Define subplot specs based on visualization types
-        specs = [[{'type': 'bar' if v == 'Bars' else 'scatter'} for v in viz_types]] * rows
-        subplot_titles = []
-        for r in range(rows):
-            for v in viz_types:
-                if r == 0:
-                    subplot_titles.append(title if v == viz_types[0] else "")
-                else:
-                    subplot_titles.append(f"Previous Step ({v})" if v == viz_types[0] else "")
+        # Frames and controls are attached once per sort; later calls only move the start point
+        if self._animation is not fig:
+            fig.frames = self._build_animation_frames(fig, viz_types)
+            pause_args = dict(frame=dict(duration=0, redraw=False), transition=dict(duration=0), mode='immediate')
+            fig.update_layout(
+                height=450,
+                updatemenus=[dict(
+                    type='buttons',
+                    direction='left',
+                    showactive=False,
+                    x=0,
+                    y=-0.15,
+                    xanchor='left',
+                    yanchor='top',
+                    buttons=[
+                        dict(label='▶ Play', method='animate', args=[None, play_args]),
+                        dict(label='⏸ Pause', method='animate', args=[[None], pause_args])
+                    ]
+                )],
+                sliders=[dict(
+                    x=0.15,
+                    y=-0.1,
+                    len=0.85,
+                    currentvalue=dict(prefix='Step ', font=WHITE_FONT),
+                    font=WHITE_FONT,
+                    steps=[
+                        dict(label=str(i + 1), method='animate', args=[[str(i)], pause_args])
+                        for i in range(len(fig.frames))
+                    ]
+                )]
+            )
+            self._animation = fig
         
-        fig = make_subplots(
-            rows=rows,
-            cols=cols,
-            subplot_titles=subplot_titles,
-            specs=specs,
-            vertical_spacing=0.1,
-            horizontal_spacing=0.05
-        )
+        # A freshly mounted chart has no current frame for fromcurrent to resume from,
+        # so Play gets the explicit frames from the selected step on
+        with fig.batch_update():
+            fig.layout.sliders[0].active = start_step
+            fig.layout.updatemenus[0].buttons[0].args = [[str(i) for i in range(start_step, self.num_steps)], play_args]
+        return fig
+    
+    def _build_animation_frames(self, fig, viz_types):
+        """Plotly frames for every step, each merged into fig's traces when played"""
+        titles = [f"Step {i + 1}: {self.step(i)['description']}" for i in range(self.num_steps)]
+        annotations = [a.to_plotly_json() for a in fig.layout.annotations]
         
-        def add_step_visualization(step, row, is_previous=False):
-            values = step['array']
-            colors = ['#4ecdc4'] * n  # Default cyan
-            sizes = [30] * n  # Default node size
-            
-            if step['type'] == 'split':
-                for idx in step.get('left', []):
-                    if idx < len(colors):
-                        colors[idx] = '#ff6b6b'  # Red for left
-                for idx in step.get('right', []):
-                    if idx < len(colors):
-                        colors[idx] = '#ffa500'  # Orange for right
-            elif step['type'] == 'merge':
-                for idx in step.get('comparing', []):
-                    if idx < len(colors):
-                        colors[idx] = '#00ff00'  # Green for current merge
-                        sizes[idx] = 40  # Larger size for animation
-            
+        # Frames carry only what changes between steps; Plotly merges them into the traces
+        frames = []
+        for i, (values, labels, colors, sizes, hovertext) in enumerate(self._frames):
+            vmax = int(values.max())
+            data = []
+            frame_layout = {'annotations': [dict(annotations[0], text=titles[i])] + annotations[1:]}
             for col_idx, viz_type in enumerate(viz_types, 1):
                 if viz_type == 'Bars':
-                    # Add bar chart
-                    fig.add_trace(
-                        go.Bar(
-                            x=list(range(n)),
-                            y=values,
-                            marker=dict(
-                                color=colors,
-                                line=dict(color='white', width=2)
-                            ),
-                            text=values,
-                            textposition='outside',
-                            textfont=dict(size=14, color='white')
-                        ),
-                        row=row,
-                        col=col_idx
-                    )
+                    data.append(go.Bar(y=values, text=labels, marker=dict(color=colors)))
                 else:
-                    # Add circular nodes with gaps
-                    x_positions = [i * 1.2 for i in range(n)]  # Add gaps by scaling x-coordinates
-                    fig.add_trace(
-                        go.Scatter(
-                            x=x_positions,
-                            y=[max(values) * 1.2] * n,
-                            mode='markers+text',
-                            marker=dict(
-                                size=sizes,
-                                color=colors,
-                                line=dict(color='white', width=2),
-                                symbol='circle',
-                                opacity=0.9
-                            ),
-                            text=values,
-                            textposition='middle center',
-                            textfont=dict(size=12, color='white'),
-                            hoverinfo='text',
-                            hovertext=[f'Value: {v}' for v in values]
-                        ),
-                        row=row,
-                        col=col_idx
-                    )
-        add_step_visualization(step_data, row=1)
-        if show_previous and step_data.get('previous_step'):
-            add_step_visualization(step_data['previous_step'], row=2, is_previous=True)
+                    data.append(go.Scattergl(
+                        y=[vmax * 1.2] * len(values),
+                        text=labels,
+                        hovertext=hovertext,
+                        marker=dict(color=colors, size=sizes)
+                    ))
+                    yaxis = f'yaxis{col_idx}' if col_idx > 1 else 'yaxis'
+                    frame_layout[yaxis] = dict(range=[0, vmax * 1.5])
+            frames.append(go.Frame(name=str(i), data=data, layout=frame_layout))
+        return frames
+    
+    def _panel_figure(self, slot, frame, title, viz_types):
+        """Create visualization based on user-selected types"""
+        values, labels, colors, sizes, hovertext = frame
+        n = len(values)
+        # One max per render, shared by the node height and the node axis range
+        vmax = int(values.max())
+        cols = len(viz_types)
         
-        layout_updates = {
-            'plot_bgcolor': 'rgba(0,0,0,0)',
-            'paper_bgcolor': 'rgba(0,0,0,0)',
-            'font': dict(color='white'),
-            'showlegend': False,
-            'height': 800 if show_previous and step_data.get('previous_step') else 400,
-            'margin': dict(l=50, r=50, t=50, b=50)
-        }
+        # Each slot's figure is assembled once per subplot layout; every later
+        # step only swaps the trace data and the node axis range in place
+        fig_key = (tuple(viz_types), n, bool(title))
+        # Consecutive steps can render to identical data, e.g. rerunning on the same step
+        render_key = (title, values.tobytes(), colors.tobytes(), sizes.tobytes())
+        cached = self._figs.get(slot)
+        if cached is not None and cached[1] == fig_key:
+            fig = cached[0]
+            if cached[2] == render_key:
+                return fig
+            self._figs[slot] = (fig, fig_key, render_key)
+            with fig.batch_update():
+                if title:
+                    fig.layout.annotations[0].text = title
+                for col_idx, (trace, viz_type) in enumerate(zip(fig.data, viz_types), 1):
+                    trace.marker.color = colors
+                    trace.text = labels
+                    if viz_type == 'Bars':
+                        trace.y = values
+                    else:
+                        trace.y = [vmax * 1.2] * n
+                        trace.marker.size = sizes
+                        trace.hovertext = hovertext
+                        yaxis = f'yaxis{col_idx}' if col_idx > 1 else 'yaxis'
+                        fig.layout[yaxis].range = [0, vmax * 1.5]
+            return fig
         
-        for row in range(1, rows + 1):
-            for col_idx, viz_type in enumerate(viz_types, 1):
-                axis_num = (row - 1) * cols + col_idx
-                xaxis = f'xaxis{axis_num}' if axis_num > 1 else 'xaxis'
-                yaxis = f'yaxis{axis_num}' if axis_num > 1 else 'yaxis'
-                
-                layout_updates[xaxis] = dict(
-                    title="Index",
-                    showgrid=False,
-                    color='white',
-                    tickfont=dict(color='white')
+        if cols == 1:
+            # A single trace needs no subplot grid, just the same title annotation
+            fig = go.Figure(layout=dict(annotations=[dict(SUBPLOT_TITLE, text=title)] if title else []))
+            grid = lambda col_idx: {}
+        else:
+            # Define subplot specs based on visualization types
+            specs = [[{'type': 'bar' if v == 'Bars' else 'scatter'} for v in viz_types]]
+            subplot_titles = [title if v == viz_types[0] else "" for v in viz_types]
+            
+            fig = make_subplots(
+                rows=1,
+                cols=cols,
+                subplot_titles=subplot_titles,
+                specs=specs,
+                horizontal_spacing=0.05
+            )
+            grid = lambda col_idx: dict(row=1, col=col_idx)
+        
+        for col_idx, viz_type in enumerate(viz_types, 1):
+            if viz_type == 'Bars':
+                # Add bar chart
+                fig.add_trace(
+                    go.Bar(
+                        x=list(range(n)),
+                        y=values,
+                        marker=dict(
+                            color=colors,
+                            line=MARKER_LINE
+                        ),
+                        text=labels,
+                        textposition='outside',
+                        textfont=BAR_TEXTFONT
+                    ),
+                    **grid(col_idx)
                 )
-                layout_updates[yaxis] = dict(
-                    title="Value",
-                    showgrid=(viz_type == 'Bars'),
-                    gridcolor='rgba(255,255,255,0.1)' if viz_type == 'Bars' else None,
-                    color='white',
-                    tickfont=dict(color='white'),
-                    range=[0, max(step_data['array']) * 1.5] if viz_type == 'Nodes' else None
+            else:
+                # Add circular nodes with gaps, drawn on one WebGL canvas instead of per-marker SVG
+                x_positions = [i * 1.2 for i in range(n)]  # Add gaps by scaling x-coordinates
+                fig.add_trace(
+                    go.Scattergl(
+                        x=x_positions,
+                        y=[vmax * 1.2] * n,
+                        mode='markers+text',
+                        marker=dict(
+                            size=sizes,
+                            color=colors,
+                            line=MARKER_LINE,
+                            symbol='circle',
+                            opacity=0.9
+                        ),
+                        text=labels,
+                        textposition='middle center',
+                        textfont=NODE_TEXTFONT,
+                        hoverinfo='text',
+                        hovertext=hovertext
+                    ),
+                    **grid(col_idx)
                 )
         
-        fig.update_layout(**layout_updates)
+        fig.update_layout(
+            plot_bgcolor=TRANSPARENT,
+            paper_bgcolor=TRANSPARENT,
+            font=WHITE_FONT,
+            showlegend=False,
+            height=400,
+            margin=FIGURE_MARGIN
+        )
+        
+        # Shared axis styling fans out to every subplot; only the y axis differs per type
+        fig.update_xaxes(X_AXIS)
+        fig.update_yaxes(Y_AXIS_COMMON)
+        for col_idx, viz_type in enumerate(viz_types, 1):
+            if viz_type == 'Bars':
+                fig.update_yaxes(showgrid=True, gridcolor=GRID_COLOR, **grid(col_idx))
+            else:
+                fig.update_yaxes(showgrid=False, range=[0, vmax * 1.5], **grid(col_idx))
         
         if 'Nodes' in viz_types:
             fig.update_traces(
@@ -294,12 +457,14 @@ class MergeSortVisualizer:
                     sizemode='diameter',
                     sizeref=0.5
                 ),
-                selector=dict(type='scatter')
+                selector=dict(type='scattergl')
             )
         
+        self._figs[slot] = (fig, fig_key, render_key)
         return fig
 
 def main():
+    inject_css()
     st.markdown('<h1 class="main-header"> Merge Sort Visualizer</h1>', unsafe_allow_html=True)
     
     if 'visualizer' not in st.session_state:
@@ -356,8 +521,8 @@ def main():
             if st.button("Create Array"):
                 try:
                     if array_input.strip():
-                        values = [int(x.strip()) for x in array_input.split(',')]
-                        if len(values) != num_nodes:
+                        values = np.array([int(x.strip()) for x in array_input.split(',')], dtype=np.int64)
+                        if values.size != num_nodes:
                             st.error(f"Please enter exactly {num_nodes} values!")
                         else:
                             st.session_state.visualizer.array = values
@@ -368,12 +533,13 @@ def main():
                             st.success("Array created successfully!")
                     else:
                         st.error("Please enter some values!")
-                except ValueError:
+                except (ValueError, OverflowError):
+                    # OverflowError: a value doesn't fit in int64
                     st.error("Please enter valid integers only!")
         
         else:  
             if st.button("Generate Random Array"):
-                random_values = [random.randint(1, 100) for _ in range(num_nodes)]
+                random_values = np.random.default_rng().integers(1, 101, size=num_nodes, dtype=np.int64)
                 st.session_state.visualizer.array = random_values
                 st.session_state.array_created = True
                 st.session_state.sorting_done = False
@@ -389,7 +555,6 @@ def main():
             if st.button("Start Merge Sort"):
                 if not st.session_state.sorting_done:
                     with st.spinner("Analyzing sorting steps..."):
-                        st.session_state.visualizer.steps = []
                         original_array = st.session_state.visualizer.array.copy()
                         st.session_state.visualizer.merge_sort_with_steps(original_array)
                         st.session_state.sorting_done = True
@@ -414,121 +579,111 @@ def main():
             
             if not st.session_state.sorting_done:
                 # Show initial array
-                initial_step = {
-                    'type': 'initial',
-                    'array': st.session_state.visualizer.array,
-                    'description': 'Initial unsorted array'
-                }
-                fig = st.session_state.visualizer.create_visualization(
-                    initial_step, 
+                fig = st.session_state.visualizer.create_initial(
+                    st.session_state.visualizer.array,
                     "Initial Array - Ready to Sort",
                     viz_types=st.session_state.viz_types
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="main_chart", config=PLOTLY_CONFIG)
                 
-                st.info(f"Array: {st.session_state.visualizer.array}")
+                st.info(f"Array: {st.session_state.visualizer.array.tolist()}")
             
             else:
                 # Show sorting visualization
-                if st.session_state.visualizer.steps:
-                    # Animation controls
-                    col_prev, col_play, col_pause, col_next, col_speed = st.columns([1, 1, 1, 1, 2])
-                    
-                    with col_prev:
-                        if st.button("<-Previous"):
-                            if st.session_state.current_step > 0:
-                                st.session_state.current_step -= 1
-                                st.session_state.is_playing = False
-                                st.rerun()
-                    
-                    with col_play:
-                        if st.button("▶ Play" if not st.session_state.is_playing else "▶ Resume"):
-                            st.session_state.is_playing = True
-                    
-                    with col_pause:
-                        if st.button("⏸ Pause"):
-                            st.session_state.is_playing = False
-                    
-                    with col_next:
-                        if st.button("Next->"):
-                            if st.session_state.current_step < len(st.session_state.visualizer.steps) - 1:
-                                st.session_state.current_step += 1
+                if st.session_state.visualizer.num_steps:
+                    # Controls, chart and step info form one fragment, so stepping
+                    # through the sort reruns only this part of the page
+                    @st.fragment
+                    def step_view():
+                        visualizer = st.session_state.visualizer
+                        num_steps = visualizer.num_steps
+                        
+                        # Animation controls
+                        col_prev, col_play, col_pause, col_next, col_speed = st.columns([1, 1, 1, 1, 2])
+                        
+                        with col_prev:
+                            if st.button("<-Previous"):
+                                if st.session_state.current_step > 0:
+                                    st.session_state.current_step -= 1
+                                    st.session_state.is_playing = False
+                        
+                        with col_play:
+                            if st.button("▶ Animate"):
+                                st.session_state.is_playing = True
+                        
+                        with col_pause:
+                            if st.button("⏹ Stop"):
                                 st.session_state.is_playing = False
-                                st.rerun()
-                    
-                    with col_speed:
-                        st.markdown("*Animation Speed*")
-                        speed = st.slider(
-                            "Speed (seconds per step)",
-                            0.1,
-                            2.0,
-                            1.0,
+                        
+                        with col_next:
+                            if st.button("Next->"):
+                                if st.session_state.current_step < num_steps - 1:
+                                    st.session_state.current_step += 1
+                                    st.session_state.is_playing = False
+                        
+                        with col_speed:
+                            st.markdown("*Animation Speed*")
+                            st.slider(
+                                "Speed (seconds per step)",
+                                0.1,
+                                2.0,
+                                1.0,
+                                key="speed",
+                                label_visibility="collapsed"
+                            )
+                        
+                        # Step navigation, bound to current_step so the buttons above move it too
+                        st.markdown("*Step Navigation*")
+                        st.slider(
+                            "Step",
+                            0,
+                            num_steps - 1,
+                            key="current_step",
                             label_visibility="collapsed"
                         )
-                    
-                    # Step navigation
-                    st.markdown("*Step Navigation*")
-                    st.session_state.current_step = st.slider(
-                        "Step",
-                        0,
-                        len(st.session_state.visualizer.steps) - 1,
-                        st.session_state.current_step,
-                        label_visibility="collapsed"
-                    )
-                    
-                    # Play animation if active
-                    if st.session_state.is_playing:
-                        progress_bar = st.progress(0)
-                        step_placeholder = st.empty()
-                        chart_placeholder = st.empty()
                         
-                        while st.session_state.is_playing and st.session_state.current_step < len(st.session_state.visualizer.steps):
-                            current_step_data = st.session_state.visualizer.steps[st.session_state.current_step]
-                            if st.session_state.current_step > 0:
-                                current_step_data['previous_step'] = st.session_state.visualizer.steps[st.session_state.current_step - 1]
-                            
-                            progress_bar.progress((st.session_state.current_step + 1) / len(st.session_state.visualizer.steps))
+                        # Playback runs in the browser from Plotly frames, so no script rerun per step;
+                        # the browser never reports its frame back, so Stop returns to the start step
+                        if st.session_state.is_playing:
+                            fig = visualizer.create_animation(
+                                st.session_state.current_step,
+                                viz_types=st.session_state.viz_types,
+                                frame_duration=int(st.session_state.speed * 1000)
+                            )
+                            st.plotly_chart(fig, use_container_width=True, key="animation_chart", config=PLOTLY_CONFIG)
+                            st.info(
+                                "The animation plays in your browser: use ▶ Play / ⏸ Pause under the chart. "
+                                f"⏹ Stop returns to step {st.session_state.current_step + 1}, where it started, "
+                                "along with the previous-step panel and step details."
+                            )
+                        else:
+                            current_step_data = visualizer.step(st.session_state.current_step)
+                            current_slot = st.container()
+                            previous_slot = st.container()
                             
-                            fig = st.session_state.visualizer.create_visualization(
-                                current_step_data, 
+                            fig = visualizer.create_current(
+                                st.session_state.current_step,
                                 f"Step {st.session_state.current_step + 1}: {current_step_data['description']}",
-                                show_previous=True,
                                 viz_types=st.session_state.viz_types
                             )
-                            chart_placeholder.plotly_chart(fig, use_container_width=True)
-                            step_placeholder.markdown(f'<div class="step-info">Step {st.session_state.current_step + 1}: {current_step_data["description"]}</div>', unsafe_allow_html=True)
+                            current_slot.plotly_chart(fig, use_container_width=True, key="main_chart", config=PLOTLY_CONFIG)
                             
-                            time.sleep(speed)
-                            st.session_state.current_step += 1
-                            if st.session_state.current_step >= len(st.session_state.visualizer.steps):
-                                st.session_state.is_playing = False
-                                break
+                            if st.session_state.current_step > 0:
+                                previous_fig = visualizer.create_previous(
+                                    st.session_state.current_step,
+                                    viz_types=st.session_state.viz_types
+                                )
+                                previous_slot.plotly_chart(previous_fig, use_container_width=True, key="previous_chart", config=PLOTLY_CONFIG)
+                            
+                            # Step information
+                            st.markdown(f'<div class="step-info">Step {st.session_state.current_step + 1} of {num_steps}: {current_step_data["description"]}</div>', unsafe_allow_html=True)
                         
-                        progress_bar.empty()
-                        if not st.session_state.is_playing and st.session_state.current_step >= len(st.session_state.visualizer.steps):
-                            st.success("🎉 Sorting completed!")
+                        # Final result, drawn inside the fragment so it follows the step controls
+                        if st.session_state.current_step == num_steps - 1:
+                            st.success("Array is now sorted!")
+                            st.balloons()
                     
-                    # Show current step
-                    if 0 <= st.session_state.current_step < len(st.session_state.visualizer.steps):
-                        current_step_data = st.session_state.visualizer.steps[st.session_state.current_step]
-                        if st.session_state.current_step > 0:
-                            current_step_data['previous_step'] = st.session_state.visualizer.steps[st.session_state.current_step - 1]
-                        
-                        fig = st.session_state.visualizer.create_visualization(
-                            current_step_data,
-                            f"Step {st.session_state.current_step + 1}: {current_step_data['description']}",
-                            show_previous=True,
-                            viz_types=st.session_state.viz_types
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
-                        
-                        # Step information
-                        st.markdown(f'<div class="step-info">Step {st.session_state.current_step + 1} of {len(st.session_state.visualizer.steps)}: {current_step_data["description"]}</div>', unsafe_allow_html=True)
-                
-                # Final result
-                if st.session_state.current_step == len(st.session_state.visualizer.steps) - 1:
-                    st.success("Array is now sorted!")
-                    st.balloons()
+                    step_view()
         
         else:
             # Welcome message
@@ -558,18 +713,14 @@ def main():
         if st.session_state.array_created:
             st.markdown("### Statistics")
             
-            array_stats = {
-                "Elements": len(st.session_state.visualizer.array),
-                "Min Value": min(st.session_state.visualizer.array),
-                "Max Value": max(st.session_state.visualizer.array)
-            }
+            array_stats = compute_stats(tuple(st.session_state.visualizer.array))
             
             for key, value in array_stats.items():
                 st.metric(key, value)
             
             if st.session_state.sorting_done:
                 st.markdown("### Algorithm Info")
-                st.info(f"*Total Steps:* {len(st.session_state.visualizer.steps)}")
+                st.info(f"*Total Steps:* {st.session_state.visualizer.num_steps}")
                 st.info(f"*Time Complexity:* O(n log n)")
                 st.info(f"*Space Complexity:* O(n)")
                 st.info(f"*Algorithm:* Divide & Conquer")
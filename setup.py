@@ -0,0 +1,9 @@
+# Optional compiled sort kernel: python setup.py build_ext --inplace
+# Build with CFLAGS=-fopenmp LDFLAGS=-fopenmp to run merge tasks on several threads
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="merge-sort-visualizer-ext",
+    ext_modules=cythonize("_mergesort.pyx"),
+)
@@ -0,0 +1,235 @@
+import numpy as np
+
+try:
+    from numba import config, njit, prange
+except ImportError:
+    # Numba is optional, the kernel still runs as plain Python without it
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+    config = None
+    prange = range
+
+# Steps are stored column-wise, one array per field (type, index, value, level, extra)
+# split steps: index = run start, value = split position, extra = run end
+# merge steps: index = written position, value = new value, extra = old value
+OP_SPLIT = 0
+OP_MERGE_PLACE = 1
+OP_MERGE_TAIL = 2
+STEP_DTYPES = (np.int8, np.int32, np.int64, np.int8, np.int64)
+
+
+def _merge(buf, tgt, lo, mid, hi, level, step_type, step_index, step_value, step_level, step_extra, k):
+    """Merge buf[lo:mid] and buf[mid:hi] into tgt[lo:hi], recording steps from slot k"""
+    step_type[k] = OP_SPLIT
+    step_index[k] = lo
+    step_value[k] = mid
+    step_level[k] = level
+    step_extra[k] = hi
+    k += 1
+
+    i = lo
+    j = mid
+    for ipos in range(lo, hi):
+        code = OP_MERGE_PLACE if i < mid and j < hi else OP_MERGE_TAIL
+        if j >= hi or (i < mid and buf[i] <= buf[j]):
+            v = buf[i]
+            i += 1
+        else:
+            v = buf[j]
+            j += 1
+        tgt[ipos] = v
+
+        step_type[k] = code
+        step_index[k] = ipos
+        step_value[k] = v
+        step_level[k] = level
+        step_extra[k] = buf[ipos]
+        k += 1
+    return k
+
+
+def _mergesort_record(arr, step_type, step_index, step_value, step_level, step_extra):
+    """Bottom-up merge sort of arr in place, returns the number of steps written"""
+    n = arr.shape[0]
+    passes = 0
+    width = 1
+    while width < n:
+        passes += 1
+        width *= 2
+
+    # Each pass merges buf into tgt by (lo, mid, hi) indices, then the two swap roles
+    buf = arr
+    tgt = np.empty_like(arr)
+    k = 0
+    width = 1
+    level = passes - 1
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            if mid < hi:
+                k = _merge(buf, tgt, lo, mid, hi, level, step_type, step_index, step_value, step_level, step_extra, k)
+            else:
+                # A lone trailing run is copied over unchanged
+                tgt[lo:hi] = buf[lo:hi]
+
+        buf, tgt = tgt, buf
+        width *= 2
+        level -= 1
+
+    # After an odd number of passes the sorted data sits in the scratch buffer
+    if passes % 2 == 1:
+        arr[:] = buf
+    return k
+
+
+# Inputs above this many elements take the parallel kernel, split into tasks of this
+# many output positions; everything the UI allows is far smaller and stays sequential
+TASK_SIZE = 4096
+
+
+def _co_rank(buf, lo, mid, hi, d):
+    """Elements taken from buf[lo:mid] among the first d outputs of its merge with buf[mid:hi]"""
+    # Merge Path: binary search the diagonal for where the merge crosses it
+    low = max(0, d - (hi - mid))
+    high = min(d, mid - lo)
+    while low < high:
+        i = (low + high) // 2
+        if buf[lo + i] <= buf[mid + d - i - 1]:
+            low = i + 1
+        else:
+            high = i
+    return low
+
+
+def _merge_range(buf, tgt, lo, mid, hi, start, stop, level, step_type, step_index, step_value, step_level, step_extra, k):
+    """Write outputs start..stop of merging buf[lo:mid] with buf[mid:hi] into tgt
+
+    k is the slot of the merge's split step; output ipos is recorded at slot
+    k + 1 + ipos - lo, so any range of the merge can be written independently.
+    """
+    if start == lo:
+        step_type[k] = OP_SPLIT
+        step_index[k] = lo
+        step_value[k] = mid
+        step_level[k] = level
+        step_extra[k] = hi
+
+    i = lo + _co_rank(buf, lo, mid, hi, start - lo)
+    j = mid + (start - i)
+    for ipos in range(start, stop):
+        code = OP_MERGE_PLACE if i < mid and j < hi else OP_MERGE_TAIL
+        if j >= hi or (i < mid and buf[i] <= buf[j]):
+            v = buf[i]
+            i += 1
+        else:
+            v = buf[j]
+            j += 1
+        tgt[ipos] = v
+
+        slot = k + 1 + ipos - lo
+        step_type[slot] = code
+        step_index[slot] = ipos
+        step_value[slot] = v
+        step_level[slot] = level
+        step_extra[slot] = buf[ipos]
+
+
+def _merge_task(buf, tgt, width, level, step_type, step_index, step_value, step_level, step_extra, k, start, stop):
+    """Produce outputs start..stop of one pass that merges runs of width into tgt"""
+    n = buf.shape[0]
+    run = 2 * width
+    lo = start // run * run
+    while lo < stop:
+        mid = min(lo + width, n)
+        hi = min(lo + run, n)
+        if mid < hi:
+            # Every earlier merge of the pass recorded run + 1 steps
+            _merge_range(buf, tgt, lo, mid, hi, max(lo, start), min(hi, stop), level,
+                         step_type, step_index, step_value, step_level, step_extra,
+                         k + lo // run * (run + 1))
+        else:
+            # A lone trailing run is copied over unchanged, each task only its own part
+            tgt[max(lo, start):min(hi, stop)] = buf[max(lo, start):min(hi, stop)]
+        lo += run
+
+
+def _parallel_mergesort_record(arr, step_type, step_index, step_value, step_level, step_extra):
+    """_mergesort_record with every pass split into parallel tasks, same steps written"""
+    n = arr.shape[0]
+    passes = 0
+    width = 1
+    while width < n:
+        passes += 1
+        width *= 2
+
+    buf = arr
+    tgt = np.empty_like(arr)
+    k = 0
+    width = 1
+    level = passes - 1
+    num_tasks = (n + TASK_SIZE - 1) // TASK_SIZE
+    while width < n:
+        # Tasks split a pass by output position, so even a single long merge is shared between threads
+        for t in prange(num_tasks):
+            _merge_task(buf, tgt, width, level, step_type, step_index, step_value, step_level, step_extra,
+                        k, t * TASK_SIZE, min((t + 1) * TASK_SIZE, n))
+
+        # Full merges record run + 1 steps each; a lone trailing run records none
+        run = 2 * width
+        last = (n - 1) // run * run
+        k += last // run * (run + 1)
+        if last + width < n:
+            k += n - last + 1
+
+        buf, tgt = tgt, buf
+        width *= 2
+        level -= 1
+
+    # After an odd number of passes the sorted data sits in the scratch buffer
+    if passes % 2 == 1:
+        arr[:] = buf
+    return k
+
+
+def max_steps(n):
+    """Upper bound on the number of steps for an n-element sort"""
+    # Every pass writes n merge steps plus at most n // 2 split steps
+    return int(np.ceil(np.log2(max(n, 2)))) * (n + n // 2)
+
+
+def alloc_steps(n):
+    """Empty step columns large enough for an n-element sort"""
+    size = max_steps(n)
+    return tuple(np.empty(size, dtype=dtype) for dtype in STEP_DTYPES)
+
+
+# Prefer the Cython build of the same kernel (python setup.py build_ext --inplace):
+# it needs no JIT warmup, so the first sort of a fresh process is just as fast
+try:
+    from _mergesort import sort_and_record
+except ImportError:
+    # Only compiled when there is no Cython build. Explicit signatures compile
+    # eagerly here, so the first sort pays no JIT cost and other dtypes fail
+    # loudly instead of recompiling; callees are compiled before their callers
+    _merge = njit("i8(i8[::1], i8[::1], i8, i8, i8, i8, i1[::1], i4[::1], i8[::1], i1[::1], i8[::1], i8)", cache=True)(_merge)
+    _mergesort_record = njit("i8(i8[::1], i1[::1], i4[::1], i8[::1], i1[::1], i8[::1])", cache=True)(_mergesort_record)
+
+    # The parallel kernel compiles lazily, on the first input above TASK_SIZE
+    _co_rank = njit(cache=True)(_co_rank)
+    _merge_range = njit(cache=True)(_merge_range)
+    _merge_task = njit(cache=True)(_merge_task)
+    _parallel_mergesort_record = njit(parallel=True, cache=True)(_parallel_mergesort_record)
+
+    def sort_and_record(arr, step_type, step_index, step_value, step_level, step_extra):
+        """Bottom-up merge sort of arr in place, returns the number of steps written"""
+        if arr.shape[0] <= TASK_SIZE:
+            return _mergesort_record(arr, step_type, step_index, step_value, step_level, step_extra)
+        if config is not None:
+            # Streamlit runs scripts on worker threads, and a TBB pool started from a
+            # worker hangs interpreter exit; OpenMP is just as thread-safe without that
+            config.THREADING_LAYER_PRIORITY = ["omp", "tbb", "workqueue"]
+        return _parallel_mergesort_record(arr, step_type, step_index, step_value, step_level, step_extra)